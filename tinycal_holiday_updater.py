@@ -1,19 +1,142 @@
+import hashlib
 import json
 import plistlib
 import os
-import re
 import requests # For fetching data from URL
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import shutil # For file backup
-from datetime import datetime
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# 在 macOS 上优先使用系统 Foundation 框架 (PyObjC) 解析和序列化 PList，
+# 未安装 PyObjC 或非 macOS 平台时回退到标准库 plistlib。
+try:
+    if sys.platform != 'darwin':
+        raise ImportError
+    from Foundation import (NSArray, NSData, NSDate, NSDictionary,
+                            NSPropertyListMutableContainers,
+                            NSPropertyListSerialization,
+                            NSPropertyListXMLFormat_v1_0)
+    HAS_FOUNDATION = True
+except ImportError:
+    HAS_FOUNDATION = False
+
+# 若已安装 orjson 则使用它解析 JSON，否则回退到标准库 json
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# macOS 没有 fdatasync，回退为 fsync
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
 
 # --- Configuration ---
 CALENDAR_DIR = os.path.join(os.path.expanduser("~"), "Library/Containers/app.cyan.tinycalx/Data/Documents/calendars")
 HOLIDAY_JSON_URL_TEMPLATE = "https://raw.githubusercontent.com/NateScarlet/holiday-cn/master/{year}.json"
 BACKUP_DIR = os.path.join(os.getcwd(), "backup") 
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache/tinycal_holiday")
+CACHE_TTL_SECONDS = 24 * 60 * 60 # 缓存有效期：24 小时
+MAX_WORKERS = 8 # 并行处理日历文件的最大线程数
+IO_BUFFER_SIZE = 1024 * 1024 # 读写 PList 文件时使用的缓冲区大小 (1 MiB)
+CALENDAR_FILENAME_TEMPLATE = "{year}.{month}.0 (zh_CN)" # 月份配置文件名，例如 2025.5.0 (zh_CN)
+
+# 复用同一个会话以保持连接，并对临时性的服务器错误自动重试
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+))
+
+def _date_key(date_str):
+    """将 "YYYY-MM-DD" 格式的日期字符串转换为 (年, 月, 日) 整数元组。"""
+    y, m, d = date_str.split('-')
+    return (int(y), int(m), int(d))
+
+def parse_schedule_map(holiday_data, year):
+    """
+    将节假日 JSON 数据解析为日期到休假状态的映射。
+    日期以 (年, 月, 日) 整数元组为键，便于逐日查找时无需再拼接日期字符串。
+
+    Args:
+        holiday_data (dict): 已解码的节假日 JSON 数据。
+        year (int): 数据对应的年份，仅用于输出提示信息。
+
+    Returns:
+        dict: 包含节假日安排的字典 (schedule_map)，如果数据无效则返回 None。
+    """
+    if 'days' in holiday_data and isinstance(holiday_data['days'], list):
+        days = holiday_data['days']
+        try:
+            # 数据格式正确时直接用字典推导式构建
+            schedule_map = {_date_key(day_info['date']): day_info['isOffDay'] for day_info in days}
+        except (KeyError, TypeError, AttributeError, ValueError):
+            # 存在无效条目时逐条解析，并给出警告
+            schedule_map = {}
+            for day_info in days:
+                if 'date' in day_info and 'isOffDay' in day_info:
+                    try:
+                        schedule_map[_date_key(day_info['date'])] = day_info['isOffDay']
+                    except (AttributeError, ValueError):
+                        print(f"警告：跳过 JSON 中日期格式无效的条目: {day_info}")
+                else:
+                    print(f"警告：跳过 JSON 中的无效条目: {day_info}")
+        if not schedule_map:
+            print(f"警告：从 {year} 年的 JSON 数据中未能解析出任何日期安排。")
+            return None
+        return schedule_map
+    else:
+        print(f"错误：{year} 年的 JSON 文件格式不正确，缺少 'days' 列表。")
+        return None
+
+def load_cached_holiday_data(cache_file_path):
+    """
+    读取本地缓存的节假日 JSON 数据。
+
+    Args:
+        cache_file_path (str): 缓存文件的完整路径。
+
+    Returns:
+        dict: 已解码的 JSON 数据，如果缓存不存在或已损坏则返回 None。
+    """
+    try:
+        with open(cache_file_path, 'rb') as fp:
+            return _loads(fp.read())
+    except (OSError, json.JSONDecodeError):
+        return None
+
+def save_holiday_data_cache(cache_file_path, meta_file_path, response):
+    """
+    将下载到的节假日 JSON 原文及其 ETag / Last-Modified 头写入本地缓存。
+    先写入临时文件再通过 os.replace 替换，避免留下写了一半的缓存文件。
+
+    Args:
+        cache_file_path (str): 缓存文件的完整路径。
+        meta_file_path (str): 保存 HTTP 校验头的元数据文件路径。
+        response (requests.Response): 成功的 HTTP 响应。
+    """
+    meta = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+    try:
+        for path, data in ((cache_file_path, response.content),
+                           (meta_file_path, json.dumps(meta).encode('utf-8'))):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'wb') as fp:
+                fp.write(data)
+            os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"警告：写入节假日数据缓存失败: {e}")
 
 def fetch_holiday_data(year):
     """
     从指定的 URL 下载并解析指定年份的节假日 JSON 数据。
+    若本地缓存未超过有效期则直接使用缓存；否则携带 ETag / Last-Modified
+    发起条件请求，服务器返回 304 时继续沿用缓存。
 
     Args:
         year (int): 需要获取数据的年份。
@@ -21,28 +144,56 @@ def fetch_holiday_data(year):
     Returns:
         dict: 包含节假日安排的字典 (schedule_map)，如果失败则返回 None。
     """
+    cache_file_path = os.path.join(CACHE_DIR, f"{year}.json")
+    meta_file_path = os.path.join(CACHE_DIR, f"{year}.meta.json")
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+    except OSError as e:
+        print(f"警告：无法创建缓存目录 {CACHE_DIR}: {e}")
+
+    cached_data = load_cached_holiday_data(cache_file_path)
+    if cached_data is not None:
+        try:
+            cache_is_fresh = os.path.getmtime(cache_file_path) > time.time() - CACHE_TTL_SECONDS
+        except OSError:
+            cache_is_fresh = False
+        if cache_is_fresh:
+            schedule_map = parse_schedule_map(cached_data, year)
+            if schedule_map:
+                print(f"使用本地缓存的 {year} 年节假日数据: {cache_file_path}")
+                return schedule_map
+
     url = HOLIDAY_JSON_URL_TEMPLATE.format(year=year)
     print(f"正在从 {url} 获取 {year} 年的节假日数据...")
+
+    headers = {}
+    if cached_data is not None:
+        meta = load_cached_holiday_data(meta_file_path) or {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
     try:
-        response = requests.get(url, timeout=10) # 10秒超时
-        response.raise_for_status()  # 如果 HTTP 请求返回了不成功的状态码，则抛出 HTTPError 异常
-        holiday_data = response.json()
+        response = _SESSION.get(url, timeout=10, headers=headers) # 10秒超时
+        if response.status_code == 304 and cached_data is not None:
+            schedule_map = parse_schedule_map(cached_data, year)
+            if schedule_map:
+                try:
+                    os.utime(cache_file_path) # 刷新缓存有效期
+                except OSError:
+                    pass
+                print(f"服务器数据未变化，使用本地缓存的 {year} 年节假日数据。")
+            return schedule_map
+        if response.status_code != 200:
+            response.raise_for_status()  # 如果 HTTP 请求返回了不成功的状态码，则抛出 HTTPError 异常
+        holiday_data = _loads(response.content)
 
-        schedule_map = {}
-        if 'days' in holiday_data and isinstance(holiday_data['days'], list):
-            for day_info in holiday_data['days']:
-                if 'date' in day_info and 'isOffDay' in day_info:
-                    schedule_map[day_info['date']] = day_info['isOffDay']
-                else:
-                    print(f"警告：跳过 JSON 中的无效条目: {day_info}")
-            if not schedule_map:
-                print(f"警告：从 {year} 年的 JSON 数据中未能解析出任何日期安排。")
-                return None
+        schedule_map = parse_schedule_map(holiday_data, year)
+        if schedule_map:
+            save_holiday_data_cache(cache_file_path, meta_file_path, response)
             print(f"成功获取并解析 {year} 年的节假日数据。")
-            return schedule_map
-        else:
-            print(f"错误：{year} 年的 JSON 文件格式不正确，缺少 'days' 列表。")
-            return None
+        return schedule_map
     except requests.exceptions.HTTPError as http_err:
         if response.status_code == 404:
             print(f"错误：未找到 {year} 年的节假日数据 (404 Not Found)。请检查年份是否正确或该年份数据是否存在。")
@@ -59,97 +210,277 @@ def fetch_holiday_data(year):
         print(f"获取或解析 {year} 年节假日数据时发生未知错误: {e}")
         return None
 
-def update_single_plist_file(plist_file_path, year_schedule_map):
+def _from_foundation(value):
     """
-    备份并根据提供的节假日安排更新单个 PList 日历文件中的 worktime 键。
-    此函数会直接修改文件。
+    将 Foundation 返回的 PList 对象递归转换为 plistlib 使用的 Python 原生类型。
+    """
+    if isinstance(value, NSDictionary):
+        return {str(k): _from_foundation(v) for k, v in value.items()}
+    if isinstance(value, NSArray):
+        return [_from_foundation(v) for v in value]
+    if isinstance(value, NSData):
+        return bytes(value)
+    if isinstance(value, NSDate):
+        # 与 plistlib 保持一致：返回不带时区信息的 UTC 时间
+        return datetime.fromtimestamp(value.timeIntervalSince1970(), timezone.utc).replace(tzinfo=None)
+    if isinstance(value, str):
+        return str(value)
+    return value # 数字和布尔值已由 PyObjC 自动转换
+
+def plist_loads(data):
+    """
+    解析 PList 文件内容。
+
+    Args:
+        data (bytes): PList 文件的原始内容 (XML 或二进制格式)。
+
+    Returns:
+        dict: 解析得到的 PList 对象。
+
+    Raises:
+        plistlib.InvalidFileException: 内容不是有效的 PList。
+    """
+    if not HAS_FOUNDATION:
+        return plistlib.loads(data)
+    ns_data = NSData.dataWithBytes_length_(data, len(data))
+    plist_object, _, error = NSPropertyListSerialization.propertyListWithData_options_format_error_(
+        ns_data, NSPropertyListMutableContainers, None, None)
+    if plist_object is None:
+        raise plistlib.InvalidFileException(str(error))
+    return _from_foundation(plist_object)
+
+def plist_dumps(plist_content):
+    """
+    将 PList 对象序列化为 TinyCal 使用的 XML 格式字节串。
+
+    Args:
+        plist_content (dict): 需要序列化的 PList 对象。
+
+    Returns:
+        bytes: 序列化后的 PList 内容。
+    """
+    if not HAS_FOUNDATION:
+        return plistlib.dumps(plist_content)
+    data, error = NSPropertyListSerialization.dataWithPropertyList_format_options_error_(
+        plist_content, NSPropertyListXMLFormat_v1_0, 0, None)
+    if data is None:
+        raise ValueError(f"无法序列化 PList: {error}")
+    return bytes(data)
+
+def build_worktime_map(year_schedule_map):
+    """
+    将节假日安排预先转换为 TinyCal 使用的 worktime 值 (2 代表休假，1 代表补班)，
+    这样逐日更新时只需一次字典查找，无需再判断休假状态。
 
     Args:
-        plist_file_path (str): PList 日历文件的完整路径。
         year_schedule_map (dict): 包含该年份节假日/工作日安排的字典。
 
     Returns:
-        tuple: (bool, bool) 第一个 bool 表示文件是否被修改，第二个 bool 表示操作是否成功。
+        dict: (年, 月, 日) 到 worktime 值的映射。
     """
-    # --- Backup original file ---
+    return {key: (2 if is_off_day else 1) for key, is_off_day in year_schedule_map.items()}
+
+def compute_schedule_hash(year_schedule_map):
+    """
+    计算节假日安排的摘要，用于判断日历文件上次更新时使用的数据是否与本次相同。
+
+    Args:
+        year_schedule_map (dict): 包含该年份节假日/工作日安排的字典。
+
+    Returns:
+        str: 节假日安排的十六进制摘要。
+    """
+    serialized = json.dumps(sorted(year_schedule_map.items())).encode('utf-8')
+    return hashlib.blake2b(serialized, digest_size=8).hexdigest()
+
+def get_stamp_file_path(plist_file_path):
+    """
+    返回记录 PList 文件上次处理状态的标记文件路径。
+    标记文件保存在缓存目录中，避免在 TinyCal 的数据目录里写入额外文件。
+    """
+    return os.path.join(CACHE_DIR, "stamps", os.path.basename(plist_file_path) + ".tinycal-stamp")
+
+def is_plist_up_to_date(plist_file_path, schedule_hash):
+    """
+    检查 PList 文件自上次处理后是否未被改动，且当时使用的是相同的节假日安排。
+
+    Args:
+        plist_file_path (str): PList 日历文件的完整路径。
+        schedule_hash (str): 本次节假日安排的摘要。
+
+    Returns:
+        bool: 若可以跳过该文件则返回 True。
+    """
+    try:
+        with open(get_stamp_file_path(plist_file_path), 'rb') as fp:
+            stamp = json.load(fp)
+        return (stamp.get('hash') == schedule_hash
+                and stamp.get('mtime') == os.stat(plist_file_path).st_mtime_ns)
+    except (OSError, ValueError, AttributeError):
+        return False
+
+def write_plist_stamp(plist_file_path, schedule_hash, log=print):
+    """
+    记录 PList 文件当前的修改时间及所用节假日安排的摘要。
+
+    Args:
+        plist_file_path (str): PList 日历文件的完整路径。
+        schedule_hash (str): 本次节假日安排的摘要。
+        log (callable): 输出提示信息的函数，默认为 print。
+    """
+    stamp_file_path = get_stamp_file_path(plist_file_path)
     try:
-        if not os.path.exists(BACKUP_DIR):
-            os.makedirs(BACKUP_DIR)
-            print(f"已创建备份目录: {BACKUP_DIR}")
+        os.makedirs(os.path.dirname(stamp_file_path), exist_ok=True)
+        stamp = {'hash': schedule_hash, 'mtime': os.stat(plist_file_path).st_mtime_ns}
+        with open(stamp_file_path, 'w') as fp:
+            json.dump(stamp, fp)
+    except OSError as e:
+        log(f"警告：写入文件 {os.path.basename(plist_file_path)} 的处理标记失败: {e}")
 
+def backup_plist_file(plist_file_path, log=print):
+    """
+    将 PList 文件备份到 BACKUP_DIR (该目录由 main 预先创建)。
+    优先创建硬链接 (无需复制数据)，跨文件系统等无法创建硬链接时回退为复制文件。
+    备份失败只输出警告，不影响后续更新。
+
+    Args:
+        plist_file_path (str): PList 日历文件的完整路径。
+        log (callable): 输出提示信息的函数，默认为 print。
+    """
+    try:
         base_filename = os.path.basename(plist_file_path)
         backup_file_path = os.path.join(BACKUP_DIR, base_filename)
-        
-        # 检查原文件是否存在，防止shutil.copy2报错
-        if not os.path.exists(plist_file_path):
-            print(f"错误：原文件 {plist_file_path} 不存在，无法备份和更新。")
-            return False, False
 
-        shutil.copy2(plist_file_path, backup_file_path)
-        print(f"已将原文件 {base_filename} 备份到 {backup_file_path}")
+        if os.path.lexists(backup_file_path):
+            os.remove(backup_file_path) # 覆盖上一次的备份
+        try:
+            os.link(plist_file_path, backup_file_path)
+        except OSError:
+            # shutil.copy2 在内核中完成复制 (macOS 上为 fcopyfile，Linux 上为 sendfile)，
+            # 无需经过用户态缓冲区；macOS 的 os.sendfile 只支持写入 socket，不能用于此处
+            shutil.copy2(plist_file_path, backup_file_path)
+        log(f"已将原文件 {base_filename} 备份到 {backup_file_path}")
     except Exception as backup_err:
-        print(f"错误：备份文件 {plist_file_path} 失败: {backup_err}")
+        log(f"错误：备份文件 {plist_file_path} 失败: {backup_err}")
         # 根据策略，可以选择在此处返回失败，或者继续尝试更新文件
         # 当前策略：备份失败也尝试更新，但给予警告
-        # return False, False # 如果希望备份失败则不进行更新，取消此行注释
 
-    # --- Load and update PList file ---
+def update_single_plist_file(plist_file_path, worktime_map, schedule_hash=None, months_in_schedule=None, log=print):
+    """
+    根据提供的节假日安排更新单个 PList 日历文件中的 worktime 键。
+    仅在确有日期需要修改时才备份并写回文件。
+
+    Args:
+        plist_file_path (str): PList 日历文件的完整路径。
+        worktime_map (dict): 由 build_worktime_map 生成的 (年, 月, 日) 到 worktime 值的映射。
+        schedule_hash (str): 节假日安排的摘要。若提供，且文件自上次处理后未被改动，则直接跳过。
+        months_in_schedule (set): 节假日安排中出现过的 (年, 月)。若提供，文件涉及的月份均不在其中时直接跳过逐日检查。
+        log (callable): 输出提示信息的函数，默认为 print。
+
+    Returns:
+        tuple: (bool, bool) 第一个 bool 表示文件是否被修改，第二个 bool 表示操作是否成功。
+    """
+    if schedule_hash is not None and is_plist_up_to_date(plist_file_path, schedule_hash):
+        log(f"文件 {os.path.basename(plist_file_path)} 自上次更新后未发生变化，跳过。")
+        return False, True
+
+    # --- Load PList file ---
     try:
-        with open(plist_file_path, 'rb') as fp:
-            plist_content = plistlib.load(fp)
-    except FileNotFoundError: # 理论上已通过上面的检查，但作为双重保障
-        print(f"错误：未找到 PList 文件 {plist_file_path} (在尝试读取时)")
+        with open(plist_file_path, 'rb', buffering=IO_BUFFER_SIZE) as fp:
+            plist_content = plist_loads(fp.read())
+    except FileNotFoundError:
+        log(f"错误：原文件 {plist_file_path} 不存在，无法备份和更新。")
         return False, False
     except plistlib.InvalidFileException:
-        print(f"错误：PList 文件格式无效 {plist_file_path}")
+        log(f"错误：PList 文件格式无效 {plist_file_path}")
         return False, False
     except Exception as e:
-        print(f"读取 PList 文件 {plist_file_path} 时发生未知错误: {e}")
+        log(f"读取 PList 文件 {plist_file_path} 时发生未知错误: {e}")
         return False, False
 
+    # --- Update PList file ---
     if 'monthData' not in plist_content or not isinstance(plist_content['monthData'], list):
-        print(f"错误：PList 文件 {plist_file_path} 中缺少 'monthData' 或其值不是列表。")
+        log(f"错误：PList 文件 {plist_file_path} 中缺少 'monthData' 或其值不是列表。")
         return False, False
 
+    month_data = plist_content['monthData']
+    if months_in_schedule is not None and month_data:
+        # 月视图可能包含相邻月份的日期，因此取首、中、尾三天来覆盖文件涉及的所有月份
+        try:
+            file_months = {(item['year'], item['month'])
+                           for item in (month_data[0], month_data[len(month_data) // 2], month_data[-1])}
+        except (KeyError, TypeError):
+            file_months = None
+        if file_months is not None and file_months.isdisjoint(months_in_schedule):
+            if schedule_hash is not None:
+                write_plist_stamp(plist_file_path, schedule_hash, log)
+            return False, True
+
     updated_entries_count = 0
-    modified_in_this_file = False
 
-    for item in plist_content['monthData']:
-        if not all(k in item for k in ['year', 'month', 'day']):
+    # PList 中的年月日本身就是整数，可直接组成查找键
+    worktime_get = worktime_map.get
+    for item in month_data:
+        try:
+            key = (item['year'], item['month'], item['day'])
+        except (KeyError, TypeError):
             continue
 
-        try:
-            item_year = int(item['year'])
-            item_month = int(item['month'])
-            item_day = int(item['day'])
-            current_date_str = f"{item_year:04d}-{item_month:02d}-{item_day:02d}"
-        except ValueError:
+        new_worktime = worktime_get(key)
+        if new_worktime is None:
             continue
 
-        if current_date_str in year_schedule_map:
-            is_off_day = year_schedule_map[current_date_str]
-            new_worktime = 2 if is_off_day else 1
-            
-            if item.get('worktime') != new_worktime:
-                item['worktime'] = new_worktime
-                updated_entries_count += 1
-                modified_in_this_file = True
+        current_worktime = item.get('worktime')
+        if current_worktime != new_worktime:
+            item['worktime'] = new_worktime
+            updated_entries_count += 1
 
-    if modified_in_this_file:
+    if updated_entries_count:
+        backup_plist_file(plist_file_path, log)
+        # 先写入临时文件再替换原文件：不会改写原文件的 inode，硬链接的备份因此保留原内容
+        tmp_file_path = plist_file_path + ".tinycal.tmp"
         try:
-            with open(plist_file_path, 'wb') as fp:
-                plistlib.dump(plist_content, fp)
-            print(f"文件 {os.path.basename(plist_file_path)} 已成功更新。共修改 {updated_entries_count} 个日期的状态。")
+            with open(tmp_file_path, 'wb', buffering=IO_BUFFER_SIZE) as fp:
+                fp.write(plist_dumps(plist_content))
+                fp.flush()
+                _fdatasync(fp.fileno()) # 确保内容落盘后再替换，避免崩溃时留下残缺的日历文件
+            shutil.copymode(plist_file_path, tmp_file_path)
+            os.replace(tmp_file_path, plist_file_path)
+            log(f"文件 {os.path.basename(plist_file_path)} 已成功更新。共修改 {updated_entries_count} 个日期的状态。")
+            if schedule_hash is not None:
+                write_plist_stamp(plist_file_path, schedule_hash, log)
             return True, True
         except Exception as e:
-            print(f"错误：保存更新后的 PList 文件 {plist_file_path} 时出错: {e}")
+            log(f"错误：保存更新后的 PList 文件 {plist_file_path} 时出错: {e}")
+            try:
+                os.remove(tmp_file_path)
+            except OSError:
+                pass
             return True, False # 尝试修改但保存失败
-    elif updated_entries_count == 0 and not modified_in_this_file:
-        # print(f"文件 {os.path.basename(plist_file_path)} 无需更新 (未找到匹配日期或状态已正确)。")
-        return False, True
-    else:
-        print(f"文件 {os.path.basename(plist_file_path)} 中的日期状态已是最新，无需更新。")
-        return False, True
+    if schedule_hash is not None:
+        write_plist_stamp(plist_file_path, schedule_hash, log)
+    # log(f"文件 {os.path.basename(plist_file_path)} 无需更新 (未找到匹配日期或状态已正确)。")
+    return False, True
+
+
+def process_plist_file(plist_file_path, worktime_map, schedule_hash=None, months_in_schedule=None):
+    """
+    在工作线程中更新单个 PList 文件，并缓存其输出信息，
+    以便主线程按文件顺序打印，避免多线程输出交错。
+
+    Args:
+        plist_file_path (str): PList 日历文件的完整路径。
+        worktime_map (dict): (年, 月, 日) 到 worktime 值的映射。
+        schedule_hash (str): 节假日安排的摘要，用于跳过自上次处理后未变化的文件。
+        months_in_schedule (set): 节假日安排中出现过的 (年, 月)，用于跳过无关月份的文件。
+
+    Returns:
+        tuple: (bool, bool, list) 是否被修改、操作是否成功，以及该文件的输出信息列表。
+    """
+    messages = []
+    modified_status, success_status = update_single_plist_file(
+        plist_file_path, worktime_map, schedule_hash, months_in_schedule, log=messages.append)
+    return modified_status, success_status, messages
 
 
 def main():
@@ -197,34 +528,45 @@ def main():
         print("请确认该路径是正确的，并且您有权限访问它。")
         return
     
+    try:
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+    except OSError as e:
+        print(f"警告：无法创建备份目录 {BACKUP_DIR}: {e}")
+
     print(f"\n将在目录 '{CALENDAR_DIR}' 中查找并处理 {target_year} 年的日历文件...")
 
     total_files_processed = 0
     files_actually_updated = 0
     files_failed_to_update = 0
     
-    filename_pattern = re.compile(r"(\d{4})\.(\d{1,2})\.0 \(zh_CN\)")
+    # 每年最多 12 个月份文件，直接检查这些文件名是否存在，无需遍历整个目录
+    target_filenames = []
+    for month in range(1, 13):
+        filename = CALENDAR_FILENAME_TEMPLATE.format(year=target_year, month=month)
+        if os.path.isfile(os.path.join(CALENDAR_DIR, filename)):
+            target_filenames.append(filename)
 
-    for filename in os.listdir(CALENDAR_DIR):
-        match = filename_pattern.fullmatch(filename)
-        if match:
-            file_year_str = match.group(1)
-            try:
-                file_year = int(file_year_str)
-                if file_year == target_year:
-                    total_files_processed +=1
-                    plist_file_full_path = os.path.join(CALENDAR_DIR, filename)
-                    
-                    print(f"\n--- 正在处理文件: {filename} ---")
-                    modified_status, success_status = update_single_plist_file(plist_file_full_path, year_schedule_map)
-                    
-                    if modified_status and success_status:
-                        files_actually_updated += 1
-                    elif not success_status:
-                        files_failed_to_update +=1
-            except ValueError:
-                print(f"警告：文件名 {filename} 中的年份格式不正确，跳过。")
-                continue
+    total_files_processed = len(target_filenames)
+    if target_filenames:
+        schedule_hash = compute_schedule_hash(year_schedule_map)
+        worktime_map = build_worktime_map(year_schedule_map)
+        months_in_schedule = {(y, m) for (y, m, _) in worktime_map}
+        plist_paths = [os.path.join(CALENDAR_DIR, filename) for filename in target_filenames]
+        # 各文件相互独立且 worktime_map 只读，可直接并行处理
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(plist_paths))) as executor:
+            results = list(executor.map(
+                lambda path: process_plist_file(path, worktime_map, schedule_hash, months_in_schedule),
+                plist_paths))
+
+        for filename, (modified_status, success_status, messages) in zip(target_filenames, results):
+            print(f"\n--- 正在处理文件: {filename} ---")
+            for message in messages:
+                print(message)
+
+            if modified_status and success_status:
+                files_actually_updated += 1
+            elif not success_status:
+                files_failed_to_update +=1
     
     print("\n-----------------------------")
     print("脚本执行完毕。")
@@ -239,7 +581,7 @@ def main():
         # 计算无需更新的文件数，这些文件可能已备份但内容未更改
         files_no_change_needed = total_files_processed - files_actually_updated - files_failed_to_update
         if files_no_change_needed > 0:
-             print(f"{files_no_change_needed} 个文件无需更新（已是最新或无匹配日期），但仍执行了备份。")
+             print(f"{files_no_change_needed} 个文件无需更新（已是最新或无匹配日期），未做备份。")
     print(f"所有备份文件（如有）均保存在: {BACKUP_DIR}")
     print("-----------------------------")
 